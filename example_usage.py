@@ -5,12 +5,14 @@ Example usage of the Knowledge System with multiple categories
 
 from knowledge import KnowledgeDB
 
-def add_example_knowledge():
+def add_example_knowledge(db=None):
     """Add some example knowledge entries with multiple categories."""
-    db = KnowledgeDB()
+    db = db or KnowledgeDB()
+    
+    examples = []
     
     # Example 1: Issue that spans multiple APIs
-    db.add_knowledge(
+    examples.append(dict(
         title="Webhook delivery failing for bulk operation completions",
         problem="Customer complaining that webhook notifications for bulk_operations/complete aren't being received after bulk product updates",
         solution="""1. Check webhook subscription exists for bulk_operations/finish topic
@@ -49,10 +51,10 @@ def verify_webhook(data, signature, secret):
     return hmac.compare_digest(computed_hmac, signature.encode())""",
         tags=["webhook-delivery", "bulk-operations", "signature-verification", "troubleshooting"],
         notes="This issue often occurs when customers use bulk operations but don't properly handle the async nature of the process."
-    )
+    ))
     
     # Example 2: Orders API with fulfillments
-    db.add_knowledge(
+    examples.append(dict(
         title="Cannot create fulfillment - Location not found error",
         problem="Getting 'Location not found' error when trying to create fulfillment via Orders API, even though location exists in admin",
         solution="""1. Verify the location ID being used in the fulfillment request
@@ -96,10 +98,10 @@ query getLocations {
 }""",
         tags=["fulfillment-errors", "location-validation", "orders", "scope-issues"],
         notes="Migration from legacy fulfillments to fulfillment_orders is ongoing - recommend new approach."
-    )
+    ))
     
     # Example 3: App configuration with billing
-    db.add_knowledge(
+    examples.append(dict(
         title="App subscription upgrade failing silently",
         problem="Customer trying to upgrade app subscription but charge isn't being created and no error returned",
         solution="""1. Check if existing subscription is properly cancelled first
@@ -141,13 +143,16 @@ mutation appSubscriptionCreate($subscription: AppSubscriptionInput!) {
 }""",
         tags=["billing-issues", "subscription-upgrade", "partner-api", "payment-methods"],
         notes="Always cancel existing subscription before creating new one to avoid conflicts."
-    )
+    ))
+    
+    # Insert all examples in one transaction
+    db.add_knowledge_bulk(examples)
     
     print("✅ Added 3 example knowledge entries with multiple categories!")
 
-def demonstrate_search():
+def demonstrate_search(db=None):
     """Show different ways to search across categories."""
-    db = KnowledgeDB()
+    db = db or KnowledgeDB()
     
     print("\n🔍 Search Examples:")
     
@@ -175,9 +180,9 @@ def demonstrate_search():
     for r in results:
         print(f"   - {r['title']}")
 
-def show_stats():
+def show_stats(db=None):
     """Show category statistics."""
-    db = KnowledgeDB()
+    db = db or KnowledgeDB()
     stats = db.get_stats()
     
     print("\n📊 Knowledge Base Statistics:")
@@ -188,9 +193,14 @@ def show_stats():
     for category, count in stats['categories'].items():
         print(f"   {category}: {count}")
 
+def main():
+    """Run all examples against a single database connection."""
+    with KnowledgeDB() as db:
+        add_example_knowledge(db)
+        demonstrate_search(db)
+        show_stats(db)
+
 if __name__ == '__main__':
-    add_example_knowledge()
-    demonstrate_search()
-    show_stats()
+    main()
 
 
@@ -7,31 +7,424 @@ A simple CLI tool for managing support knowledge and solutions.
 import sqlite3
 import json
 import argparse
+import atexit
 import datetime
+import queue
 import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 import uuid
 
+try:
+    import orjson
+except ImportError:  # optional; only speeds up JSON export
+    orjson = None
+
+# Used when config.json is missing or unreadable
+_DEFAULT_CONFIG = {
+    "categories": ["general"],
+    "shopify_products": [""]
+}
+
+@lru_cache(maxsize=1)
+def load_config(path: str = 'config.json') -> Mapping:
+    """Parse config.json once per process and return it read-only."""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = _DEFAULT_CONFIG
+    return MappingProxyType(config)
+
+# Idle read-only connections kept per KnowledgeDB; extra ones opened under
+# a burst of concurrent reads are closed once they are returned
+_READ_POOL_SIZE = 8
+
+# Bumped whenever init_db needs to migrate data in existing databases
+_SCHEMA_VERSION = 6
+
+# UUIDs are stored as 16-byte BLOBs and handed out as 32-char hex strings
+_KNOWLEDGE_COLUMNS = '''
+    k.id, lower(hex(k.uuid)) AS uuid, k.title, k.problem, k.solution, k.categories_csv,
+    k.shopify_product, k.api_version, k.code_examples, k.tags, k.notes, k.source,
+    k.created_at, k.updated_at, k.usage_count, k.effectiveness_score
+'''
+
+# Statement text is kept constant so sqlite3's per-connection statement
+# cache (keyed by SQL string) reuses the prepared statement.
+_SQL_INSERT_KNOWLEDGE = '''
+    INSERT INTO knowledge (
+        uuid, title, problem, solution, categories_csv, shopify_product,
+        api_version, code_examples, tags, notes, source
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_UPDATE_KNOWLEDGE = '''
+    UPDATE knowledge SET
+        title = ?, problem = ?, solution = ?, categories_csv = ?,
+        shopify_product = ?, api_version = ?, code_examples = ?,
+        tags = ?, notes = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+_SQL_INSERT_CATEGORY = '''
+    INSERT OR IGNORE INTO knowledge_categories (knowledge_id, category)
+    VALUES (?, ?)
+'''
+
+_SQL_DELETE_CATEGORIES = 'DELETE FROM knowledge_categories WHERE knowledge_id = ?'
+
+_SQL_INSERT_TAG = '''
+    INSERT OR IGNORE INTO knowledge_tags (knowledge_id, tag)
+    VALUES (?, ?)
+'''
+
+_SQL_DELETE_TAGS = 'DELETE FROM knowledge_tags WHERE knowledge_id = ?'
+
+# List pages only show the start of the problem text
+_SEARCH_COLUMNS = _KNOWLEDGE_COLUMNS + (
+    ', substr(k.problem, 1, 200) AS problem_snippet, length(k.problem) AS problem_length')
+
+_SQL_GET_BY_UUID = f'SELECT {_KNOWLEDGE_COLUMNS} FROM knowledge k WHERE k.uuid = ?'
+
+_SQL_GET_BY_ID = f'SELECT {_KNOWLEDGE_COLUMNS} FROM knowledge k WHERE k.id = ?'
+
+# Diacritic-folding tokenizer plus prefix indexes so 'webh*' style
+# queries are answered from the index instead of scanning the term list
+_SQL_CREATE_FTS = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+        title, problem, solution, tags, code_examples,
+        content='knowledge',
+        content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2",
+        prefix='2 3 4'
+    )
+'''
+
+# Triggers that mirror knowledge into the external-content FTS index
+_SQL_FTS_TRIGGERS = {
+    'knowledge_ai': '''
+        CREATE TRIGGER IF NOT EXISTS knowledge_ai AFTER INSERT ON knowledge
+        BEGIN
+            INSERT INTO knowledge_fts (rowid, title, problem, solution, tags, code_examples)
+            VALUES (new.id, new.title, new.problem, new.solution, new.tags,
+                    COALESCE(new.code_examples, ''));
+        END
+    ''',
+    'knowledge_ad': '''
+        CREATE TRIGGER IF NOT EXISTS knowledge_ad AFTER DELETE ON knowledge
+        BEGIN
+            INSERT INTO knowledge_fts (knowledge_fts, rowid, title, problem, solution, tags, code_examples)
+            VALUES ('delete', old.id, old.title, old.problem, old.solution, old.tags,
+                    COALESCE(old.code_examples, ''));
+        END
+    ''',
+    # Metadata-only updates (notes, product, ...) skip re-tokenizing the row
+    'knowledge_au': '''
+        CREATE TRIGGER IF NOT EXISTS knowledge_au
+        AFTER UPDATE OF title, problem, solution, tags, code_examples ON knowledge
+        WHEN new.title IS NOT old.title OR new.problem IS NOT old.problem
+          OR new.solution IS NOT old.solution OR new.tags IS NOT old.tags
+          OR new.code_examples IS NOT old.code_examples
+        BEGIN
+            INSERT INTO knowledge_fts (knowledge_fts, rowid, title, problem, solution, tags, code_examples)
+            VALUES ('delete', old.id, old.title, old.problem, old.solution, old.tags,
+                    COALESCE(old.code_examples, ''));
+            INSERT INTO knowledge_fts (rowid, title, problem, solution, tags, code_examples)
+            VALUES (new.id, new.title, new.problem, new.solution, new.tags,
+                    COALESCE(new.code_examples, ''));
+        END
+    ''',
+}
+
+# Timestamps are cast to TEXT so exported rows are JSON-ready as-is
+_SQL_EXPORT_KNOWLEDGE = '''
+    SELECT id, lower(hex(uuid)) AS uuid, title, problem, solution, categories_csv, shopify_product,
+           api_version, code_examples, tags, notes, source,
+           CAST(created_at AS TEXT) AS created_at,
+           CAST(updated_at AS TEXT) AS updated_at,
+           usage_count, effectiveness_score
+    FROM knowledge ORDER BY created_at
+'''
+
+_SQL_EXPORT_USAGE = '''
+    SELECT id, knowledge_id, CAST(used_at AS TEXT) AS used_at, context, helpful, notes
+    FROM knowledge_usage ORDER BY used_at
+'''
+
+_SQL_RECORD_USAGE = '''
+    INSERT INTO knowledge_usage (knowledge_id, context, helpful, notes)
+    VALUES (?, ?, ?, ?)
+'''
+
+# Queued usage events carry the time they happened (UTC, in the
+# CURRENT_TIMESTAMP format) rather than the time they were written
+_SQL_RECORD_USAGE_AT = '''
+    INSERT INTO knowledge_usage (knowledge_id, context, helpful, notes, used_at)
+    VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+'''
+
+def _json_dumps(obj) -> str:
+    """Serialize with orjson when it is installed, else the stdlib encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _decode_cats(categories_csv: Optional[str]) -> List[str]:
+    """Split the stored comma-separated categories column into a list."""
+    return categories_csv.split(',') if categories_csv else ['general']
+
+def _decode_tags(tags: Optional[str]) -> List[str]:
+    """Split the stored comma-separated tags column into a list."""
+    return tags.split(',') if tags else []
+
+def _fetch_dicts(cursor) -> List[Dict]:
+    """Fetch all rows as dicts, reading the column names only once."""
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+# Separators inside a single list item ("a, b" passed as one value)
+_LIST_SPLIT_RE = re.compile(r'\s*,\s*')
+
+def _norm_list(items: Iterable[str]) -> List[str]:
+    """Lowercase, strip and de-duplicate (keeping order) a category/tag list."""
+    seen = set()
+    normalized = []
+    for item in items:
+        # Split on commas so one value can't corrupt the comma-separated columns
+        for value in _LIST_SPLIT_RE.split(item.strip().lower()):
+            if value and value not in seen:
+                seen.add(value)
+                normalized.append(value)
+    return normalized
+
+# Quoted phrases or bare whitespace-separated terms in a search string
+_FTS_TOKEN_RE = re.compile(r'"[^"]*"?|\S+')
+_FTS_OPERATORS = ('AND', 'OR', 'NOT')
+
+def _fts_query(query: str) -> str:
+    """Turn free text into a safe FTS5 MATCH expression."""
+    terms = []
+    for token in _FTS_TOKEN_RE.findall(query):
+        if token in _FTS_OPERATORS:
+            # Operators are binary; drop leading or repeated ones
+            if terms and terms[-1] not in _FTS_OPERATORS:
+                terms.append(token)
+            continue
+        prefix = token.endswith('*')
+        text = token.rstrip('*').strip('"')
+        if text:
+            # Quoted so punctuation ("order-id", "api:") can't break the syntax;
+            # a trailing '*' stays a prefix match
+            terms.append('"%s"%s' % (text.replace('"', '""'), '*' if prefix else ''))
+    while terms and terms[-1] in _FTS_OPERATORS:
+        terms.pop()
+    return ' '.join(terms)
+
+def _import_entry(row: Dict) -> Dict:
+    """Map an exported row onto add_knowledge keyword arguments."""
+    entry = dict(row)
+    categories = entry.get('categories')
+    if categories is None:
+        entry['categories'] = entry.get('categories_csv')
+    elif isinstance(categories, str) and categories.lstrip().startswith('['):
+        # Older exports hold categories as a JSON array string
+        entry['categories'] = json.loads(categories)
+    # Exports hold comma-separated strings; _norm_list splits them
+    for key in ('categories', 'tags'):
+        if isinstance(entry.get(key), str):
+            entry[key] = [entry[key]]
+    # Keep the exported UUID (hex, or hyphenated in older exports)
+    if isinstance(entry.get('uuid'), str):
+        entry['uuid'] = uuid.UUID(entry['uuid'])
+    return entry
+
+# Composed search SQL keyed by filter shape, so searches with the same shape
+# share one SQL string (and therefore one cached prepared statement).
+_SEARCH_SQL_CACHE = {}
+
+def _search_query(has_query: bool, by_rank: bool, category_count: int,
+                  has_product: bool, tag_count: int, has_after: bool) -> str:
+    """Compose (and memoize) the search SQL for one filter shape."""
+    key = (has_query, by_rank, category_count, has_product, tag_count, has_after)
+    sql = _SEARCH_SQL_CACHE.get(key)
+    if sql is not None:
+        return sql
+    
+    if has_query:
+        # Resolve FTS matches first so the planner can't trade the FTS
+        # index for a scan of knowledge when filters are present.
+        # Column weights: title, problem, solution, tags, code_examples.
+        sql = f'''
+            WITH fts AS (
+                SELECT rowid, bm25(knowledge_fts, 5.0, 2.0, 3.0, 1.0, 1.0) AS score
+                FROM knowledge_fts
+                WHERE knowledge_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            )
+            SELECT {_SEARCH_COLUMNS}, fts.score AS score FROM fts
+            JOIN knowledge k ON k.id = fts.rowid
+            WHERE 1=1
+        '''
+    else:
+        sql = f'SELECT {_SEARCH_COLUMNS} FROM knowledge k WHERE 1=1'
+    
+    if category_count:
+        # Match entries in any of the requested categories
+        placeholders = ", ".join("?" * category_count)
+        sql += (' AND k.id IN (SELECT knowledge_id FROM knowledge_categories'
+                f' WHERE category IN ({placeholders}))')
+    
+    if has_product:
+        sql += ' AND k.shopify_product = ?'
+    
+    if tag_count:
+        # Entries must carry every requested tag
+        placeholders = ", ".join("?" * tag_count)
+        sql += (' AND k.id IN (SELECT knowledge_id FROM knowledge_tags'
+                f' WHERE tag IN ({placeholders})'
+                ' GROUP BY knowledge_id HAVING COUNT(DISTINCT tag) = ?)')
+    
+    if has_after:
+        sql += ' AND (k.created_at, k.id) < (?, ?)'
+    
+    if by_rank:
+        sql += ' ORDER BY fts.score LIMIT ?'
+    else:
+        sql += ' ORDER BY k.created_at DESC, k.id DESC LIMIT ?'
+    _SEARCH_SQL_CACHE[key] = sql
+    return sql
+
+def next_cursor(results: List[Dict]) -> Optional[Tuple[str, int]]:
+    """Keyset cursor to pass as search_knowledge(after=...) for the next page."""
+    if not results:
+        return None
+    last = results[-1]
+    return (last['created_at'], last['id'])
+
 class KnowledgeDB:
     def __init__(self, db_path: str = "knowledge.db"):
         self.db_path = db_path
+        self._connect()
         self.init_db()
+        # Long-lived front ends (web, GUI) never call close(); still run
+        # PRAGMA optimize and release the WAL cleanly at interpreter exit
+        atexit.register(self.close)
+    
+    def _connect(self):
+        # One connection for the lifetime of the object; transactions are
+        # managed explicitly (isolation_level=None) via _transaction().
+        self._conn = self._open_connection()
+        # The connection is shared between threads (e.g. Flask's); only
+        # one of them may hold a transaction on it at a time
+        self._lock = threading.RLock()
+        # Idle read-only connections; see _reading()
+        self._read_pool = queue.LifoQueue(maxsize=_READ_POOL_SIZE)
+        self._local = threading.local()
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        self._configure_connection(conn)
+        return conn
+    
+    def reopen_after_fork(self):
+        """Give a forked child process its own connections."""
+        # Inherited connections must not be used or closed in the child;
+        # keeping them referenced stops them being finalized here
+        self._inherited = (self._conn, self._read_pool)
+        self._connect()
+    
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Apply connection pragmas once instead of paying defaults per call."""
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA mmap_size=268435456')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA foreign_keys=ON')
+        # Wait for another process's write lock instead of failing at once
+        cursor.execute('PRAGMA busy_timeout=5000')
+    
+    @contextmanager
+    def _reading(self):
+        """Borrow a read-only connection for the enclosed queries."""
+        # Nested use on one thread shares the outer connection and its transaction
+        conn = getattr(self._local, 'reader', None)
+        if conn is not None:
+            yield conn
+            return
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_connection()
+            conn.execute('PRAGMA query_only=ON')
+        self._local.reader = conn
+        try:
+            yield conn
+        finally:
+            self._local.reader = None
+            try:
+                self._read_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self):
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            while not self._read_pool.empty():
+                self._read_pool.get_nowait().close()
+            # Refresh planner statistics for tables that changed this session
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
+            self._conn = None
+            atexit.unregister(self.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in a single BEGIN IMMEDIATE ... COMMIT."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
     
     def init_db(self):
         """Initialize the SQLite database with required tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._transaction() as cursor:
+            self._create_schema(cursor)
+            self._migrate(cursor)
+    
+    def _create_schema(self, cursor):
+        """Create tables and indexes that don't exist yet."""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
         
         # Main knowledge table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS knowledge (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uuid TEXT UNIQUE NOT NULL,
+                uuid BLOB(16) UNIQUE NOT NULL,
                 title TEXT NOT NULL,
                 problem TEXT NOT NULL,
                 solution TEXT NOT NULL,
-                categories TEXT DEFAULT 'general',  -- JSON array of categories
+                categories_csv TEXT DEFAULT 'general',  -- comma-separated categories
                 shopify_product TEXT,
                 api_version TEXT,
                 code_examples TEXT,
@@ -44,6 +437,9 @@ class KnowledgeDB:
                 effectiveness_score REAL DEFAULT 0.0
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_k_product ON knowledge(shopify_product)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_k_created_id ON knowledge(created_at DESC, id DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_k_usage ON knowledge(usage_count DESC)')
         
         # Usage tracking table
         cursor.execute('''
@@ -57,18 +453,148 @@ class KnowledgeDB:
                 FOREIGN KEY (knowledge_id) REFERENCES knowledge (id)
             )
         ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_ku_knowledge
+            ON knowledge_usage(knowledge_id, used_at DESC)
+        ''')
+        
+        # Keep knowledge.usage_count in step with the usage log
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_usage_inc AFTER INSERT ON knowledge_usage
+            BEGIN
+                UPDATE knowledge
+                SET usage_count = usage_count + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = NEW.knowledge_id;
+            END
+        ''')
         
         # Create full-text search index
+        cursor.execute(_SQL_CREATE_FTS)
+        for trigger_sql in _SQL_FTS_TRIGGERS.values():
+            cursor.execute(trigger_sql)
+        
+        if 'knowledge' in existing and 'knowledge_au' not in existing:
+            # The index used to be maintained by hand; rebuild it from
+            # knowledge once so the triggers start from a consistent state.
+            cursor.execute("INSERT INTO knowledge_fts (knowledge_fts) VALUES ('rebuild')")
+        
+        # Normalized categories; this is the queryable source, while
+        # categories_csv only serves whole-row reads and exports.
         cursor.execute('''
-            CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
-                title, problem, solution, tags, code_examples,
-                content='knowledge',
-                content_rowid='id'
-            )
+            CREATE TABLE IF NOT EXISTS knowledge_categories (
+                knowledge_id INTEGER,
+                category TEXT,
+                PRIMARY KEY (knowledge_id, category)
+            ) WITHOUT ROWID
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_kc_cat ON knowledge_categories(category)')
+        
+        if 'knowledge' in existing and 'knowledge_categories' not in existing:
+            # Backfill from the JSON column that predates this table (and the
+            # rename to categories_csv); older rows may hold a bare string
+            cursor.execute('''
+                SELECT k.id, j.value FROM knowledge k, json_each(
+                    CASE WHEN json_valid(k.categories) THEN k.categories
+                         ELSE json_array(k.categories) END
+                ) j
+                WHERE j.value IS NOT NULL
+            ''')
+            cursor.executemany(_SQL_INSERT_CATEGORY, [
+                (knowledge_id, category)
+                for knowledge_id, value in cursor.fetchall()
+                for category in _norm_list([str(value)])
+            ])
         
-        conn.commit()
-        conn.close()
+        # Normalized tags (the comma-separated column still feeds FTS)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS knowledge_tags (
+                knowledge_id INTEGER,
+                tag TEXT,
+                PRIMARY KEY (knowledge_id, tag)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_kt_tag ON knowledge_tags(tag)')
+        
+        if 'knowledge' in existing and 'knowledge_tags' not in existing:
+            cursor.execute("SELECT id, tags FROM knowledge WHERE tags IS NOT NULL AND tags != ''")
+            cursor.executemany(_SQL_INSERT_TAG, [
+                (knowledge_id, tag)
+                for knowledge_id, tags_str in cursor.fetchall()
+                for tag in _norm_list([tags_str])
+            ])
+    
+    def _migrate(self, cursor):
+        """Bring data written by older versions up to _SCHEMA_VERSION."""
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        
+        if version < 1:
+            # UUIDs used to be stored as hyphenated TEXT
+            cursor.execute("SELECT id, uuid FROM knowledge WHERE typeof(uuid) = 'text'")
+            converted = []
+            for knowledge_id, uuid_text in cursor.fetchall():
+                try:
+                    converted.append((uuid.UUID(uuid_text).bytes, knowledge_id))
+                except ValueError:
+                    pass
+            cursor.executemany('UPDATE knowledge SET uuid = ? WHERE id = ?', converted)
+        
+        if version < 2:
+            # Categories used to be stored as a JSON array in 'categories'
+            cursor.execute('PRAGMA table_info(knowledge)')
+            if 'categories' in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE knowledge RENAME COLUMN categories TO categories_csv')
+                cursor.execute('''
+                    UPDATE knowledge
+                    SET categories_csv = (SELECT group_concat(value, ',') FROM json_each(categories_csv))
+                    WHERE json_valid(categories_csv) AND json_type(categories_csv) = 'array'
+                ''')
+        
+        if version < 3:
+            # knowledge_au gained a WHEN clause; CREATE IF NOT EXISTS won't replace it
+            cursor.execute('DROP TRIGGER IF EXISTS knowledge_au')
+            cursor.execute(_SQL_FTS_TRIGGERS['knowledge_au'])
+        
+        if version < 4:
+            # Superseded by idx_k_created_id, which also serves keyset paging
+            cursor.execute('DROP INDEX IF EXISTS idx_k_created')
+        
+        if version < 5:
+            # The tokenizer and prefix options are fixed at creation time
+            cursor.execute('DROP TABLE IF EXISTS knowledge_fts')
+            cursor.execute(_SQL_CREATE_FTS)
+            cursor.execute("INSERT INTO knowledge_fts (knowledge_fts) VALUES ('rebuild')")
+        
+        if version < 6:
+            # Rows written before _norm_list kept categories and tags as typed
+            self._normalize_lists(cursor)
+        
+        if version < _SCHEMA_VERSION:
+            cursor.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+    
+    @staticmethod
+    def _normalize_lists(cursor):
+        """Rewrite stored categories and tags (columns and tables) via _norm_list."""
+        cursor.execute('SELECT id, categories_csv, tags FROM knowledge')
+        updates = []
+        category_rows = []
+        tag_rows = []
+        for knowledge_id, categories_csv, tags_str in cursor.fetchall():
+            categories = _norm_list([categories_csv or '']) or ['general']
+            tags = _norm_list([tags_str or ''])
+            new_categories_csv = ','.join(categories)
+            # Keep NULL tags NULL so knowledge_au doesn't reindex the row
+            new_tags_str = ','.join(tags) if tags_str is not None else None
+            if (new_categories_csv, new_tags_str) != (categories_csv, tags_str):
+                updates.append((new_categories_csv, new_tags_str, knowledge_id))
+            category_rows.extend((knowledge_id, c) for c in categories)
+            tag_rows.extend((knowledge_id, t) for t in tags)
+        
+        cursor.executemany('UPDATE knowledge SET categories_csv = ?, tags = ? WHERE id = ?', updates)
+        cursor.execute('DELETE FROM knowledge_categories')
+        cursor.execute('DELETE FROM knowledge_tags')
+        cursor.executemany(_SQL_INSERT_CATEGORY, category_rows)
+        cursor.executemany(_SQL_INSERT_TAG, tag_rows)
     
     def add_knowledge(self, title: str, problem: str, solution: str, 
                      categories: List[str] = None, shopify_product: str = None,
@@ -76,192 +602,205 @@ class KnowledgeDB:
                      tags: List[str] = None, notes: str = None,
                      source: str = "manual") -> str:
         """Add new knowledge entry."""
-        knowledge_uuid = str(uuid.uuid4())
-        tags_str = ",".join(tags) if tags else ""
-        categories_json = json.dumps(categories if categories else ["general"])
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO knowledge (
-                uuid, title, problem, solution, categories, shopify_product,
-                api_version, code_examples, tags, notes, source
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (knowledge_uuid, title, problem, solution, categories_json, shopify_product,
-              api_version, code_examples, tags_str, notes, source))
-        
-        knowledge_id = cursor.lastrowid
-        
-        # Update FTS index
-        cursor.execute('''
-            INSERT INTO knowledge_fts (rowid, title, problem, solution, tags, code_examples)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (knowledge_id, title, problem, solution, tags_str, code_examples or ""))
+        return self.add_knowledge_bulk([dict(
+            title=title, problem=problem, solution=solution, categories=categories,
+            shopify_product=shopify_product, api_version=api_version,
+            code_examples=code_examples, tags=tags, notes=notes, source=source
+        )])[0]
+    
+    def add_knowledge_bulk(self, entries: List[Dict]) -> List[str]:
+        """Add entries (add_knowledge keyword dicts) in one transaction; returns their UUIDs."""
+        with self._transaction() as cursor:
+            return self._insert_entries(cursor, entries)
+    
+    def bulk_import(self, rows: Iterable[Dict]) -> int:
+        """Import add_knowledge or exported rows, rebuilding the FTS index once; returns the count."""
+        entries = (_import_entry(row) for row in rows)
+        with self._transaction() as cursor:
+            # The rebuild covers the whole table, so this only pays off for large imports
+            for name in _SQL_FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            count = len(self._insert_entries(cursor, entries))
+            cursor.execute("INSERT INTO knowledge_fts (knowledge_fts) VALUES ('rebuild')")
+            for trigger_sql in _SQL_FTS_TRIGGERS.values():
+                cursor.execute(trigger_sql)
+        return count
+    
+    @staticmethod
+    def _insert_entries(cursor, entries: Iterable[Dict]) -> List[str]:
+        """Insert entries (and their category/tag rows); returns their UUIDs."""
+        uuids = []
+        category_rows = []
+        tag_rows = []
         
-        conn.commit()
-        conn.close()
+        for entry in entries:
+            knowledge_uuid = entry.get('uuid') or uuid.uuid4()
+            tags = _norm_list(entry.get('tags') or ())
+            tags_str = ",".join(tags)
+            categories = _norm_list(entry.get('categories') or ()) or ["general"]
+            
+            cursor.execute(_SQL_INSERT_KNOWLEDGE, (
+                knowledge_uuid.bytes, entry['title'], entry['problem'], entry['solution'],
+                ",".join(categories), entry.get('shopify_product'),
+                entry.get('api_version'), entry.get('code_examples'), tags_str,
+                entry.get('notes'), entry.get('source', "manual")))
+            
+            # knowledge_fts is kept in sync by the knowledge_ai trigger
+            knowledge_id = cursor.lastrowid
+            
+            category_rows.extend((knowledge_id, c) for c in categories)
+            tag_rows.extend((knowledge_id, t) for t in tags)
+            uuids.append(knowledge_uuid.hex)
         
-        return knowledge_uuid
+        cursor.executemany(_SQL_INSERT_CATEGORY, category_rows)
+        cursor.executemany(_SQL_INSERT_TAG, tag_rows)
+        return uuids
     
     def update_knowledge(self, knowledge_id: int, title: str, problem: str, solution: str,
                         categories: List[str] = None, shopify_product: str = None,
                         api_version: str = None, code_examples: str = None,
                         tags: List[str] = None, notes: str = None) -> bool:
         """Update existing knowledge entry."""
-        tags_str = ",".join(tags) if tags else ""
-        categories_json = json.dumps(categories if categories else ["general"])
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE knowledge SET
-                title = ?, problem = ?, solution = ?, categories = ?,
-                shopify_product = ?, api_version = ?, code_examples = ?,
-                tags = ?, notes = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (title, problem, solution, categories_json, shopify_product,
-              api_version, code_examples, tags_str, notes, knowledge_id))
-        
-        # Update FTS index
-        cursor.execute('''
-            UPDATE knowledge_fts SET
-                title = ?, problem = ?, solution = ?, tags = ?, code_examples = ?
-            WHERE rowid = ?
-        ''', (title, problem, solution, tags_str, code_examples or "", knowledge_id))
+        tags = _norm_list(tags or ())
+        tags_str = ",".join(tags)
+        categories = _norm_list(categories or ()) or ["general"]
+        categories_csv = ",".join(categories)
         
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
+        with self._transaction() as cursor:
+            cursor.execute(_SQL_UPDATE_KNOWLEDGE, (
+                title, problem, solution, categories_csv, shopify_product,
+                api_version, code_examples, tags_str, notes, knowledge_id))
+            success = cursor.rowcount > 0
+            
+            if success:
+                cursor.execute(_SQL_DELETE_CATEGORIES, (knowledge_id,))
+                cursor.executemany(_SQL_INSERT_CATEGORY, [(knowledge_id, c) for c in categories])
+                cursor.execute(_SQL_DELETE_TAGS, (knowledge_id,))
+                if tags:
+                    cursor.executemany(_SQL_INSERT_TAG, [(knowledge_id, t) for t in tags])
         
         return success
     
     def search_knowledge(self, query: str = None, categories: List[str] = None, 
                         shopify_product: str = None, tags: List[str] = None,
-                        limit: int = 20) -> List[Dict]:
+                        limit: int = 20, order_by: str = None,
+                        after: Tuple[str, int] = None) -> List[Dict]:
         """Search knowledge entries."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
         if query:
-            # Use FTS for text search
-            sql = '''
-                SELECT k.* FROM knowledge k
-                JOIN knowledge_fts fts ON k.id = fts.rowid
-                WHERE knowledge_fts MATCH ?
-            '''
-            params = [query]
+            query = _fts_query(query)
+            if not query:
+                # Nothing left to match ('"', '*', 'NOT'); don't list everything
+                return []
+        
+        # 'rank' is best bm25 score first (lower is better), 'recent' newest first
+        if order_by is None:
+            order_by = 'rank' if query else 'recent'
+        if order_by not in ('rank', 'recent'):
+            raise ValueError(f"order_by must be 'rank' or 'recent', not {order_by!r}")
+        by_rank = bool(query) and order_by == 'rank'
+        # after is next_cursor() of the previous page
+        if after and by_rank:
+            raise ValueError("after is only supported with order_by='recent'")
+        
+        # Match the normalization applied on write; duplicates would only
+        # lengthen the IN lists
+        if categories:
+            categories = _norm_list(categories)
+        if tags:
+            tags = _norm_list(tags)
+        has_filters = bool(categories or shopify_product or tags)
+        sql = _search_query(bool(query), by_rank, len(categories or []),
+                            bool(shopify_product), len(tags or []), bool(after))
+        if query and not by_rank:
+            # Recency order has to see every match, not just the best ones
+            params = [query, -1]
+        elif query:
+            # Over-fetch FTS candidates when filters may discard some of them
+            params = [query, limit * 10 if has_filters else limit]
         else:
-            sql = 'SELECT * FROM knowledge WHERE 1=1'
             params = []
         
         # Add filters
         if categories:
-            # Check if any of the requested categories are in the JSON array
-            category_conditions = []
-            for cat in categories:
-                category_conditions.append("JSON_EXTRACT(categories, '$') LIKE ?")
-                params.append(f'%"{cat}"%')
-            if category_conditions:
-                sql += f' AND ({" OR ".join(category_conditions)})'
-        
+            params.extend(categories)
         if shopify_product:
-            sql += ' AND shopify_product = ?'
             params.append(shopify_product)
-        
         if tags:
-            for tag in tags:
-                sql += ' AND tags LIKE ?'
-                params.append(f'%{tag}%')
-        
-        sql += ' ORDER BY created_at DESC LIMIT ?'
+            params.extend(tags)
+            params.append(len(tags))
+        if after:
+            params.extend(after)
         params.append(limit)
         
-        cursor.execute(sql, params)
-        results = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
+        with self._reading() as conn:
+            results = _fetch_dicts(conn.execute(sql, params))
+        for result in results:
+            result['_categories'] = _decode_cats(result['categories_csv'])
+            result['_tags'] = _decode_tags(result['tags'])
         return results
     
     def get_knowledge(self, knowledge_id: int = None, knowledge_uuid: str = None) -> Optional[Dict]:
-        """Get specific knowledge entry."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+        """Get specific knowledge entry by id or UUID (hex or raw bytes)."""
         if knowledge_uuid:
-            cursor.execute('SELECT * FROM knowledge WHERE uuid = ?', (knowledge_uuid,))
+            if isinstance(knowledge_uuid, str):
+                try:
+                    knowledge_uuid = uuid.UUID(knowledge_uuid).bytes
+                except ValueError:
+                    return None
+            sql, params = _SQL_GET_BY_UUID, (knowledge_uuid,)
         elif knowledge_id:
-            cursor.execute('SELECT * FROM knowledge WHERE id = ?', (knowledge_id,))
+            sql, params = _SQL_GET_BY_ID, (knowledge_id,)
         else:
             return None
         
-        result = cursor.fetchone()
-        conn.close()
-        
-        return dict(result) if result else None
+        with self._reading() as conn:
+            results = _fetch_dicts(conn.execute(sql, params))
+        if not results:
+            return None
+        result = results[0]
+        result['_categories'] = _decode_cats(result['categories_csv'])
+        result['_tags'] = _decode_tags(result['tags'])
+        return result
     
     def record_usage(self, knowledge_id: int, context: str = "manual", 
                     helpful: bool = None, notes: str = None):
         """Record knowledge usage for analytics."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Record usage
-        cursor.execute('''
-            INSERT INTO knowledge_usage (knowledge_id, context, helpful, notes)
-            VALUES (?, ?, ?, ?)
-        ''', (knowledge_id, context, helpful, notes))
-        
-        # Update usage count
-        cursor.execute('''
-            UPDATE knowledge 
-            SET usage_count = usage_count + 1, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (knowledge_id,))
-        
-        conn.commit()
-        conn.close()
+        # Record usage; usage_count is bumped by the trg_usage_inc trigger.
+        # Taking the lock keeps the insert out of another thread's transaction.
+        with self._lock:
+            self._conn.execute(_SQL_RECORD_USAGE, (knowledge_id, context, helpful, notes))
+    
+    def record_usage_bulk(self, events: List[Tuple]) -> None:
+        """Record (knowledge_id, context, helpful, notes, used_at) events in one transaction."""
+        with self._transaction() as cursor:
+            cursor.executemany(_SQL_RECORD_USAGE_AT, events)
     
     def get_stats(self) -> Dict:
         """Get knowledge base statistics."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total count
-        cursor.execute('SELECT COUNT(*) FROM knowledge')
-        total_count = cursor.fetchone()[0]
-        
-        # By category - flatten JSON arrays and count
-        cursor.execute('''
-            WITH RECURSIVE category_split(category, rest) AS (
-                SELECT JSON_EXTRACT(categories, '$[0]'), categories FROM knowledge
-                UNION ALL
-                SELECT JSON_EXTRACT(rest, '$[1]'), JSON_REMOVE(rest, '$[0]') 
-                FROM category_split 
-                WHERE JSON_ARRAY_LENGTH(rest) > 1
-            )
-            SELECT category, COUNT(*) FROM category_split WHERE category IS NOT NULL GROUP BY category
-        ''')
-        categories = dict(cursor.fetchall())
-        
-        # Most used
-        cursor.execute('''
-            SELECT title, usage_count FROM knowledge 
-            ORDER BY usage_count DESC LIMIT 5
-        ''')
-        most_used = cursor.fetchall()
-        
-        # Recent additions
-        cursor.execute('''
-            SELECT COUNT(*) FROM knowledge 
-            WHERE created_at > date('now', '-7 days')
-        ''')
-        recent_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with self._reading() as conn:
+            cursor = conn.cursor()
+            
+            # Total count
+            cursor.execute('SELECT COUNT(*) FROM knowledge')
+            total_count = cursor.fetchone()[0]
+            
+            # By category
+            cursor.execute('SELECT category, COUNT(*) FROM knowledge_categories GROUP BY category')
+            categories = dict(cursor.fetchall())
+            
+            # Most used
+            cursor.execute('''
+                SELECT title, usage_count FROM knowledge 
+                ORDER BY usage_count DESC LIMIT 5
+            ''')
+            most_used = cursor.fetchall()
+            
+            # Recent additions
+            cursor.execute('''
+                SELECT COUNT(*) FROM knowledge 
+                WHERE created_at > date('now', '-7 days')
+            ''')
+            recent_count = cursor.fetchone()[0]
         
         return {
             'total_count': total_count,
@@ -272,94 +811,86 @@ class KnowledgeDB:
     
     def get_all_tags(self) -> List[Dict]:
         """Get all unique tags with their usage counts."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get all tags and split them
-        cursor.execute('SELECT tags FROM knowledge WHERE tags IS NOT NULL AND tags != ""')
-        tags_rows = cursor.fetchall()
-        
-        # Count tag usage
-        tag_counts = {}
-        for row in tags_rows:
-            if row[0]:
-                tags = [tag.strip() for tag in row[0].split(',')]
-                for tag in tags:
-                    if tag:
-                        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # Sort by usage count (descending) then alphabetically
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: (-x[1], x[0].lower()))
-        
-        conn.close()
-        return [{'tag': tag, 'count': count} for tag, count in sorted_tags]
+        with self._reading() as conn:
+            rows = conn.execute('''
+                SELECT tag, COUNT(*) AS c FROM knowledge_tags
+                GROUP BY tag
+                ORDER BY c DESC, tag COLLATE NOCASE
+            ''').fetchall()
+        return [{'tag': tag, 'count': count} for tag, count in rows]
+    
+    def get_dashboard_bundle(self, recent_limit: int = 10) -> Tuple[Dict, List[Dict], List[Dict]]:
+        """Return (stats, recent entries, tags) for the dashboard."""
+        with self._reading() as conn:
+            # One read transaction: the same snapshot for all three reads
+            conn.execute('BEGIN')
+            try:
+                return (self.get_stats(),
+                        self.search_knowledge(limit=recent_limit),
+                        self.get_all_tags())
+            finally:
+                conn.execute('COMMIT')
     
     def delete_knowledge(self, knowledge_id: int) -> bool:
         """Delete a knowledge entry and its associated data."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # Delete from usage table first (foreign key constraint)
-            cursor.execute('DELETE FROM knowledge_usage WHERE knowledge_id = ?', (knowledge_id,))
-            
-            # Delete from FTS table
-            cursor.execute('DELETE FROM knowledge_fts WHERE rowid = ?', (knowledge_id,))
-            
-            # Delete from main table
-            cursor.execute('DELETE FROM knowledge WHERE id = ?', (knowledge_id,))
-            
-            conn.commit()
-            success = cursor.rowcount > 0
+            with self._transaction() as cursor:
+                # Delete from usage table first (foreign key constraint)
+                cursor.execute('DELETE FROM knowledge_usage WHERE knowledge_id = ?', (knowledge_id,))
+                
+                cursor.execute(_SQL_DELETE_CATEGORIES, (knowledge_id,))
+                cursor.execute(_SQL_DELETE_TAGS, (knowledge_id,))
+                
+                # Delete from main table (the knowledge_ad trigger updates FTS)
+                cursor.execute('DELETE FROM knowledge WHERE id = ?', (knowledge_id,))
+                success = cursor.rowcount > 0
             
         except Exception as e:
-            conn.rollback()
             success = False
             print(f"Error deleting knowledge: {e}")
-        finally:
-            conn.close()
         
         return success
     
     def export_knowledge(self, file_path: str):
         """Export all knowledge to JSON file."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM knowledge ORDER BY created_at')
-        knowledge = [dict(row) for row in cursor.fetchall()]
-        
-        cursor.execute('SELECT * FROM knowledge_usage ORDER BY used_at')
-        usage = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        
-        export_data = {
-            'knowledge': knowledge,
-            'usage': usage,
-            'exported_at': datetime.datetime.now().isoformat()
-        }
-        
-        with open(file_path, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        with self._reading() as conn, open(file_path, 'w', encoding='utf-8') as f:
+            cursor = conn.cursor()
+            f.write('{\n  "knowledge": [')
+            self._write_rows(f, cursor.execute(_SQL_EXPORT_KNOWLEDGE))
+            f.write('],\n  "usage": [')
+            self._write_rows(f, cursor.execute(_SQL_EXPORT_USAGE))
+            f.write('],\n  "exported_at": ')
+            f.write(_json_dumps(datetime.datetime.now().isoformat()))
+            f.write('\n}\n')
+    
+    @staticmethod
+    def _write_rows(f, cursor):
+        """Write cursor rows as the body of a JSON array, one row per line."""
+        names = [column[0] for column in cursor.description]
+        separator = '\n    '
+        wrote_any = False
+        for row in cursor:
+            f.write(separator)
+            f.write(_json_dumps(dict(zip(names, row))))
+            separator = ',\n    '
+            wrote_any = True
+        if wrote_any:
+            f.write('\n  ')
 
 def print_knowledge(knowledge: Dict, detailed: bool = False):
     """Pretty print knowledge entry."""
     print(f"\n📝 {knowledge['title']}")
     
-    # Handle categories (JSON array)
-    try:
-        categories = json.loads(knowledge['categories']) if knowledge['categories'] else ['general']
-        categories_str = ", ".join(categories)
-        print(f"   Categories: {categories_str}")
-    except:
-        print(f"   Categories: {knowledge.get('categories', 'general')}")
+    # Categories are decoded once by search_knowledge/get_knowledge
+    categories = knowledge.get('_categories') or ['general']
+    print(f"   Categories: {', '.join(categories)}")
     
     if knowledge['shopify_product']:
         print(f"   Product: {knowledge['shopify_product']}")
     if knowledge['tags']:
         print(f"   Tags: {knowledge['tags']}")
+    if knowledge.get('score') is not None:
+        print(f"   Relevance: {-knowledge['score']:.2f}")
     
     if detailed:
         print(f"\n❗ Problem:")
@@ -403,12 +934,16 @@ def main():
     search_parser.add_argument('--categories', nargs='+', help='Filter by categories (space-separated)')
     search_parser.add_argument('--product', help='Filter by product')
     search_parser.add_argument('--tags', help='Filter by tags')
+    search_parser.add_argument('--order', choices=['rank', 'recent'],
+                               help='Result order (default: rank for text queries, else recent)')
     search_parser.add_argument('--detailed', '-d', action='store_true', help='Show detailed results')
     
     # List command
     list_parser = subparsers.add_parser('list', help='List all knowledge')
     list_parser.add_argument('--categories', nargs='+', help='Filter by categories (space-separated)')
     list_parser.add_argument('--limit', type=int, default=20, help='Limit results')
+    list_parser.add_argument('--after', nargs=2, metavar=('CREATED_AT', 'ID'),
+                             help='Continue listing after this entry (printed at the end of a full page)')
     list_parser.add_argument('--detailed', '-d', action='store_true', help='Show detailed results')
     
     # Show command
@@ -457,7 +992,8 @@ def main():
             query=args.query,
             categories=args.categories,
             shopify_product=args.product,
-            tags=tags
+            tags=tags,
+            order_by=args.order
         )
         
         if not results:
@@ -468,9 +1004,11 @@ def main():
                 print_knowledge(knowledge, detailed=args.detailed)
     
     elif args.command == 'list':
+        after = (args.after[0], int(args.after[1])) if args.after else None
         results = db.search_knowledge(
             categories=args.categories,
-            limit=args.limit
+            limit=args.limit,
+            after=after
         )
         
         if not results:
@@ -479,6 +1017,9 @@ def main():
             print(f"Showing {len(results)} knowledge entries:")
             for knowledge in results:
                 print_knowledge(knowledge, detailed=args.detailed)
+            if len(results) == args.limit:
+                created_at, knowledge_id = next_cursor(results)
+                print(f"More entries: --after '{created_at}' {knowledge_id}")
     
     elif args.command == 'show':
         knowledge = db.get_knowledge(knowledge_id=args.id)
@@ -488,8 +1029,13 @@ def main():
             print(f"Knowledge with ID {args.id} not found.")
     
     elif args.command == 'use':
-        db.record_usage(args.id, helpful=args.helpful, notes=args.notes)
-        print(f"✅ Usage recorded for knowledge ID {args.id}")
+        try:
+            db.record_usage(args.id, helpful=args.helpful, notes=args.notes)
+        except sqlite3.IntegrityError:
+            # knowledge_usage references knowledge(id), so unknown ids are rejected
+            print(f"Knowledge with ID {args.id} not found.")
+        else:
+            print(f"✅ Usage recorded for knowledge ID {args.id}")
     
     elif args.command == 'stats':
         stats = db.get_stats()
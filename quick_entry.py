@@ -4,10 +4,16 @@ Quick Knowledge Entry Tool
 A simple GUI for quickly capturing support knowledge.
 """
 
+import concurrent.futures
+import functools
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from knowledge import KnowledgeDB
-import json
+from knowledge import KnowledgeDB, load_config
+
+def _take(widget):
+    """Text widget contents, stripped, or None when blank."""
+    # 'end-1c' leaves out the newline Tk always appends
+    return widget.get('1.0', 'end-1c').strip() or None
 
 class QuickEntryGUI:
     def __init__(self):
@@ -16,12 +22,10 @@ class QuickEntryGUI:
         self.root.title("Quick Knowledge Entry")
         self.root.geometry("800x600")
         
-        # Load config
-        try:
-            with open('config.json', 'r') as f:
-                self.config = json.load(f)
-        except:
-            self.config = {"categories": ["general"], "shopify_products": [""]}
+        self.config = load_config()
+        
+        # Database calls run off the Tk thread so the window keeps redrawing
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
         
         self.create_widgets()
     
@@ -82,8 +86,9 @@ class QuickEntryGUI:
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=9, column=0, columnspan=2, pady=20)
         
-        ttk.Button(button_frame, text="💾 Save Knowledge", 
-                  command=self.save_knowledge).pack(side=tk.LEFT, padx=(0, 10))
+        self.save_button = ttk.Button(button_frame, text="💾 Save Knowledge", 
+                                      command=self.save_knowledge)
+        self.save_button.pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="🔍 Search Existing", 
                   command=self.search_knowledge).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="🗑️ Clear Form", 
@@ -91,6 +96,11 @@ class QuickEntryGUI:
         ttk.Button(button_frame, text="❌ Close", 
                   command=self.root.quit).pack(side=tk.LEFT)
         
+        # Shown only while a save or search is running
+        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        self.progress.grid(row=10, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        self.progress.grid_remove()
+        
         # Configure grid weights
         main_frame.columnconfigure(1, weight=1)
         self.root.columnconfigure(0, weight=1)
@@ -102,54 +112,98 @@ class QuickEntryGUI:
     def save_knowledge(self):
         # Validate inputs
         title = self.title_entry.get().strip()
-        problem = self.problem_text.get(1.0, tk.END).strip()
-        solution = self.solution_text.get(1.0, tk.END).strip()
+        problem = _take(self.problem_text)
+        solution = _take(self.solution_text)
         
         if not title or not problem or not solution:
             messagebox.showerror("Error", "Please fill in Title, Problem, and Solution fields.")
             return
         
         # Get optional fields
-        category = self.category_combo.get() or "general"
-        product = self.product_combo.get() or None
-        code = self.code_text.get(1.0, tk.END).strip() or None
         tags_str = self.tags_entry.get().strip()
-        tags = [t.strip() for t in tags_str.split(",") if t.strip()] if tags_str else None
-        notes = self.notes_text.get(1.0, tk.END).strip() or None
-        
+        entry = dict(
+            title=title,
+            problem=problem,
+            solution=solution,
+            categories=[self.category_combo.get() or "general"],
+            shopify_product=self.product_combo.get() or None,
+            code_examples=_take(self.code_text),
+            tags=[t.strip() for t in tags_str.split(",") if t.strip()] if tags_str else None,
+            notes=_take(self.notes_text)
+        )
+        
+        # Save to database in the background and clear the form right away;
+        # the entry is put back if the save fails. The button stays disabled
+        # until the result is in so a double click can't save twice.
+        self.save_button.state(['disabled'])
+        self.clear_form()
+        self._run_in_background(
+            functools.partial(self._save_done, entry),
+            self.db.add_knowledge, **entry, source="gui"
+        )
+    
+    def _save_done(self, entry, future):
+        self.save_button.state(['!disabled'])
         try:
-            # Save to database
-            knowledge_uuid = self.db.add_knowledge(
-                title=title,
-                problem=problem,
-                solution=solution,
-                category=category,
-                shopify_product=product,
-                code_examples=code,
-                tags=tags,
-                notes=notes,
-                source="gui"
-            )
-            
-            messagebox.showinfo("Success", f"Knowledge saved successfully!\nUUID: {knowledge_uuid}")
-            self.clear_form()
-            
+            knowledge_uuid = future.result()
         except Exception as e:
+            self._restore_form(entry)
             messagebox.showerror("Error", f"Failed to save knowledge: {str(e)}")
+            return
+        
+        messagebox.showinfo("Success", f"Knowledge saved successfully!\nUUID: {knowledge_uuid}")
+    
+    def _restore_form(self, entry):
+        """Refill the form with an entry that could not be saved."""
+        self.clear_form()
+        self.title_entry.insert(0, entry['title'])
+        self.problem_text.insert(1.0, entry['problem'])
+        self.solution_text.insert(1.0, entry['solution'])
+        self.code_text.insert(1.0, entry['code_examples'] or '')
+        self.tags_entry.insert(0, ', '.join(entry['tags'] or ()))
+        self.notes_text.insert(1.0, entry['notes'] or '')
+        self.category_combo.set(entry['categories'][0])
+        self.product_combo.set(entry['shopify_product'] or '')
     
     def search_knowledge(self):
         # Simple search dialog
         search_term = tk.simpledialog.askstring("Search", "Enter search term:")
         if search_term:
-            results = self.db.search_knowledge(query=search_term, limit=5)
-            if results:
-                result_text = "\n\n".join([
-                    f"📝 {r['title']}\n💡 {r['solution'][:100]}..."
-                    for r in results
-                ])
-                messagebox.showinfo("Search Results", result_text)
-            else:
-                messagebox.showinfo("Search Results", "No matching knowledge found.")
+            self._run_in_background(self._search_done, self.db.search_knowledge,
+                                    query=search_term, limit=5)
+    
+    def _search_done(self, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Search failed: {str(e)}")
+            return
+        
+        if results:
+            result_text = "\n\n".join([
+                f"📝 {r['title']}\n💡 {r['solution'][:100]}..."
+                for r in results
+            ])
+            messagebox.showinfo("Search Results", result_text)
+        else:
+            messagebox.showinfo("Search Results", "No matching knowledge found.")
+    
+    def _run_in_background(self, on_done, func, *args, **kwargs):
+        """Run func on the worker pool and hand its future to on_done on the Tk thread."""
+        future = self._executor.submit(func, *args, **kwargs)
+        self.progress.grid()
+        self.progress.start(10)
+        self.root.after(50, self._poll, future, on_done)
+    
+    def _poll(self, future, on_done):
+        # Tk widgets may only be touched from the main thread, so poll
+        # rather than using a done-callback from the worker
+        if not future.done():
+            self.root.after(50, self._poll, future, on_done)
+            return
+        self.progress.stop()
+        self.progress.grid_remove()
+        on_done(future)
     
     def clear_form(self):
         self.title_entry.delete(0, tk.END)
@@ -164,6 +218,8 @@ class QuickEntryGUI:
     
     def run(self):
         self.root.mainloop()
+        # Let a save that is still in flight finish before exiting
+        self._executor.shutdown(wait=True)
 
 if __name__ == '__main__':
     import tkinter.simpledialog
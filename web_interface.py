@@ -4,87 +4,253 @@ Web Interface for Knowledge System
 A simple Flask web app for managing knowledge.
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-from knowledge import KnowledgeDB
+from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask_caching import Cache
+from flask_compress import Compress
+from flask_wtf import FlaskForm
+from jinja2 import FileSystemBytecodeCache
+from wtforms import StringField, TextAreaField
+from wtforms.validators import DataRequired
+from knowledge import KnowledgeDB, load_config
+import argparse
+import atexit
+import datetime
 import json
 import os
+import queue
+import sqlite3
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # optional; only speeds up the JSON API
+    orjson = None
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'
+# Templates ship in templates/; keep compiled ones instead of re-checking
+# their mtimes on every render
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+# Compiled templates persist in a per-user temp directory, so a new process
+# loads bytecode instead of compiling each template on its first request
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
-# Add custom filter for JSON parsing
-@app.template_filter('from_json')
-def from_json_filter(value):
-    """Parse JSON string in templates."""
-    try:
-        return json.loads(value)
-    except (json.JSONDecodeError, TypeError):
-        return [value] if value else []
+# HTML and JSON responses compress several-fold; level 4 keeps the
+# per-response CPU cost low
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
+
+# Dashboard data only changes on writes, which invalidate these entries;
+# the timeout bounds staleness across separate worker processes
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+_DASHBOARD_CACHE_KEYS = ('view//', 'view//api/stats')
+
+# Cache-Control for GET responses that also get an ETag. The dashboard
+# always revalidates so a redirect after a write never shows a stale copy.
+_CACHE_CONTROL = {
+    '/': 'no-cache',
+    '/api/stats': 'public, max-age=10, stale-while-revalidate=60',
+}
+
+def _has_flashes():
+    """Pages showing flash messages are per-visitor and must not be cached."""
+    return '_flashes' in session
+
+def _invalidate_caches():
+    """Drop cached dashboard, stats and search responses after a write."""
+    cache.delete_many(*_DASHBOARD_CACHE_KEYS)
+    cache.delete_memoized(_cached_search)
+
+@app.after_request
+def add_cache_headers(response):
+    """Let browsers revalidate the dashboard and stats with a weak ETag."""
+    cache_control = _CACHE_CONTROL.get(request.path)
+    # Rendering flashed messages pops them, which marks the session modified
+    if (cache_control and request.method == 'GET' and response.status_code == 200
+            and not session.modified):
+        response.headers['Cache-Control'] = cache_control
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    return response
+
+def _split_list(value):
+    """Split a comma-separated form value into stripped, non-empty items."""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+def _blank_to_none(value):
+    return value or None
+
+class KnowledgeForm(FlaskForm):
+    """Fields shared by the add and edit pages; data maps onto KnowledgeDB."""
+    title = StringField('Issue Title', [DataRequired()])
+    problem = TextAreaField('Problem Description', [DataRequired()])
+    solution = TextAreaField('Solution Steps', [DataRequired()])
+    categories = StringField('Categories', filters=[lambda s: _split_list(s) or ['general']])
+    shopify_product = StringField('Shopify Product', filters=[_blank_to_none])
+    api_version = StringField('API Version', filters=[_blank_to_none])
+    code_examples = TextAreaField('Code Examples', filters=[_blank_to_none])
+    tags = StringField('Tags', filters=[lambda s: _split_list(s) or None])
+    notes = TextAreaField('Notes', filters=[_blank_to_none])
+    
+    def knowledge_fields(self):
+        """Field data as keyword arguments for add/update_knowledge."""
+        data = self.data
+        data.pop('csrf_token', None)
+        return data
+    
+    def flash_errors(self):
+        for field_name, errors in self.errors.items():
+            label = self[field_name].label.text if field_name in self else field_name
+            for error in errors:
+                flash(f'{label}: {error}', 'error')
 
 # Initialize database
 db = KnowledgeDB()
 
-# Load config
-try:
-    with open('config.json', 'r') as f:
-        config = json.load(f)
-except:
-    config = {
-        "categories": ["general"],
-        "shopify_products": [""]
-    }
+config = load_config()
+
+# (value, label) pairs for category <select>s, built once instead of per render
+CATEGORY_OPTIONS = [(c, c.replace('_', ' ').title()) for c in config['categories']]
+
+def _json_bytes(obj):
+    """Encode obj as JSON with orjson when available (the json module otherwise)."""
+    if orjson is None:
+        return json.dumps(obj).encode()
+    return orjson.dumps(obj)
+
+def _json(obj):
+    return app.response_class(_json_bytes(obj), mimetype='application/json')
+
+# Public /api/search fields; internal columns like categories_csv stay out
+_API_FIELDS = (
+    'id', 'uuid', 'title', 'problem', 'solution', 'shopify_product',
+    'api_version', 'code_examples', 'tags', 'notes', 'source',
+    'created_at', 'updated_at', 'usage_count', 'effectiveness_score',
+)
+
+def _api_row(row):
+    """Map a search row to the documented /api/search fields."""
+    item = {field: row[field] for field in _API_FIELDS}
+    item['categories'] = row['_categories']
+    return item
+
+@cache.memoize(timeout=30)
+def _cached_search(query, categories, limit):
+    """Encoded /api/search results; repeated queries skip FTS and encoding."""
+    results = db.search_knowledge(
+        query=query if query else None,
+        categories=list(categories) or None,
+        limit=limit
+    )
+    return _json_bytes([_api_row(row) for row in results])
+
+# Usage clicks are queued and written in batches by a background thread,
+# so /use doesn't wait on a commit per click
+_usage_queue = queue.Queue()
+_USAGE_BATCH_SIZE = 100
+_USAGE_FLUSH_SECONDS = 0.5
+
+def _write_usage(batch):
+    """Write one batch of usage events, skipping any that no longer apply."""
+    try:
+        db.record_usage_bulk(batch)
+    except sqlite3.IntegrityError:
+        # An entry was deleted while its usage sat in the queue; the
+        # failed batch rolled back, so retry the events one at a time
+        for event in batch:
+            try:
+                db.record_usage_bulk([event])
+            except sqlite3.IntegrityError:
+                pass
+    _invalidate_caches()
+
+def _usage_writer():
+    """Drain the usage queue until the None sentinel arrives."""
+    while True:
+        event = _usage_queue.get()
+        if event is None:
+            return
+        batch = [event]
+        deadline = time.monotonic() + _USAGE_FLUSH_SECONDS
+        while len(batch) < _USAGE_BATCH_SIZE:
+            try:
+                event = _usage_queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if event is None:
+                _write_usage(batch)
+                return
+            batch.append(event)
+        try:
+            _write_usage(batch)
+        except Exception as e:
+            print(f"Error recording usage: {e}")
+
+_usage_thread = threading.Thread(target=_usage_writer, name='usage-writer', daemon=True)
+_usage_thread.start()
+
+@atexit.register
+def _flush_usage():
+    """Write whatever is still queued before the process exits."""
+    _usage_queue.put(None)
+    _usage_thread.join(timeout=5)
+
+def _after_fork():
+    """Set up per-process state in workers forked from a preloaded app."""
+    # Children inherit the master's connections but not its writer thread
+    global _usage_queue, _usage_thread
+    db.reopen_after_fork()
+    _usage_queue = queue.Queue()
+    _usage_thread = threading.Thread(target=_usage_writer, name='usage-writer', daemon=True)
+    _usage_thread.start()
+
+# Not available on Windows, where nothing is forked
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+# Load every template now, at import (once in the master with --preload),
+# rather than on the first request that renders it
+for _template_name in app.jinja_env.list_templates():
+    app.jinja_env.get_template(_template_name)
 
 @app.route('/')
+@cache.cached(timeout=30, unless=_has_flashes)
 def index():
     """Main dashboard."""
-    stats = db.get_stats()
-    recent_knowledge = db.search_knowledge(limit=10)
-    all_tags = db.get_all_tags()
+    stats, recent_knowledge, all_tags = db.get_dashboard_bundle()
     return render_template('index.html', stats=stats, recent_knowledge=recent_knowledge, all_tags=all_tags, config=config)
 
 @app.route('/add', methods=['GET', 'POST'])
 def add_knowledge():
     """Add new knowledge."""
-    if request.method == 'POST':
+    form = KnowledgeForm()
+    if form.validate_on_submit():
         try:
-            title = request.form['title']
-            problem = request.form['problem']
-            solution = request.form['solution']
-            categories_str = request.form.get('categories', '')
-            categories = [c.strip() for c in categories_str.split(',') if c.strip()] if categories_str else ['general']
-            product = request.form.get('shopify_product') or None
-            api_version = request.form.get('api_version') or None
-            code = request.form.get('code_examples') or None
-            tags_str = request.form.get('tags', '')
-            tags = [t.strip() for t in tags_str.split(',') if t.strip()] if tags_str else None
-            notes = request.form.get('notes') or None
-            
-            knowledge_uuid = db.add_knowledge(
-                title=title,
-                problem=problem,
-                solution=solution,
-                categories=categories,
-                shopify_product=product,
-                api_version=api_version,
-                code_examples=code,
-                tags=tags,
-                notes=notes,
-                source="web"
-            )
+            knowledge_uuid = db.add_knowledge(**form.knowledge_fields(), source="web")
+            _invalidate_caches()
             
             flash(f'Knowledge added successfully! UUID: {knowledge_uuid}', 'success')
             return redirect(url_for('index'))
             
         except Exception as e:
             flash(f'Error adding knowledge: {str(e)}', 'error')
+    elif form.is_submitted():
+        form.flash_errors()
     
-    return render_template('add.html', config=config)
+    return render_template('add.html', form=form, category_options=CATEGORY_OPTIONS, config=config)
 
 @app.route('/search')
 def search():
     """Search knowledge."""
     query = request.args.get('q', '')
-    categories_str = request.args.get('categories', '')
+    # The search form's select sends a single 'category'
+    selected_category = request.args.get('category', '')
+    categories_str = request.args.get('categories', '') or selected_category
     categories = [c.strip() for c in categories_str.split(',') if c.strip()] if categories_str else None
     product = request.args.get('product', '')
     
@@ -102,11 +268,15 @@ def search():
                          query=query, 
                          categories=categories_str, 
                          product=product,
+                         category_options=CATEGORY_OPTIONS,
+                         selected_category=selected_category,
                          config=config)
 
 @app.route('/category/<category_name>')
 def category_filter(category_name):
     """Filter knowledge by category."""
+    # Categories are stored lowercased; older links may not be
+    category_name = category_name.strip().lower()
     results = db.search_knowledge(categories=[category_name])
     stats = db.get_stats()
     category_count = stats['categories'].get(category_name, 0)
@@ -120,6 +290,7 @@ def category_filter(category_name):
 @app.route('/tag/<tag_name>')
 def tag_filter(tag_name):
     """Filter knowledge by tag."""
+    tag_name = tag_name.strip().lower()
     results = db.search_knowledge(tags=[tag_name])
     all_tags = db.get_all_tags()
     tag_count = next((tag['count'] for tag in all_tags if tag['tag'] == tag_name), 0)
@@ -148,43 +319,23 @@ def edit_knowledge(knowledge_id):
         flash('Knowledge not found', 'error')
         return redirect(url_for('index'))
     
-    if request.method == 'POST':
+    form = KnowledgeForm()
+    if form.validate_on_submit():
         try:
-            title = request.form['title']
-            problem = request.form['problem']
-            solution = request.form['solution']
-            categories_str = request.form.get('categories', '')
-            categories = [c.strip() for c in categories_str.split(',') if c.strip()] if categories_str else ['general']
-            product = request.form.get('shopify_product') or None
-            api_version = request.form.get('api_version') or None
-            code = request.form.get('code_examples') or None
-            tags_str = request.form.get('tags', '')
-            tags = [t.strip() for t in tags_str.split(',') if t.strip()] if tags_str else None
-            notes = request.form.get('notes') or None
-            
-            # Update the knowledge entry
-            db.update_knowledge(
-                knowledge_id=knowledge_id,
-                title=title,
-                problem=problem,
-                solution=solution,
-                categories=categories,
-                shopify_product=product,
-                api_version=api_version,
-                code_examples=code,
-                tags=tags,
-                notes=notes
-            )
+            db.update_knowledge(knowledge_id=knowledge_id, **form.knowledge_fields())
+            _invalidate_caches()
             
             flash('Knowledge updated successfully!', 'success')
             return redirect(url_for('view_knowledge', knowledge_id=knowledge_id))
             
         except Exception as e:
             flash(f'Error updating knowledge: {str(e)}', 'error')
+    elif form.is_submitted():
+        form.flash_errors()
     
     # Debug config
     print(f"DEBUG: Shopify products in config: {config['shopify_products']}")
-    return render_template('edit.html', knowledge=knowledge, config=config)
+    return render_template('edit.html', knowledge=knowledge, form=form, config=config)
 
 @app.route('/knowledge/<int:knowledge_id>/delete', methods=['POST'])
 def delete_knowledge(knowledge_id):
@@ -198,6 +349,7 @@ def delete_knowledge(knowledge_id):
         # Get title before deletion (knowledge is a dict, not an object)
         title = knowledge['title'] if isinstance(knowledge, dict) else knowledge.title
         success = db.delete_knowledge(knowledge_id)
+        _invalidate_caches()
         if success:
             flash(f'Knowledge "{title}" deleted successfully!', 'success')
         else:
@@ -215,18 +367,14 @@ def api_search():
     categories = [c.strip() for c in categories_str.split(',') if c.strip()] if categories_str else None
     limit = int(request.args.get('limit', 10))
     
-    results = db.search_knowledge(
-        query=query if query else None,
-        categories=categories,
-        limit=limit
-    )
-    
-    return jsonify(results)
+    body = _cached_search(query, tuple(categories or ()), limit)
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/stats')
+@cache.cached(timeout=30)
 def api_stats():
     """API endpoint for stats."""
-    return jsonify(db.get_stats())
+    return _json(db.get_stats())
 
 @app.route('/use/<int:knowledge_id>', methods=['POST'])
 def use_knowledge(knowledge_id):
@@ -234,278 +382,36 @@ def use_knowledge(knowledge_id):
     helpful = request.form.get('helpful') == 'true'
     notes = request.form.get('notes', '')
     
-    db.record_usage(knowledge_id, context="web", helpful=helpful, notes=notes)
+    used_at = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    _usage_queue.put((knowledge_id, "web", helpful, notes, used_at))
     flash('Usage recorded!', 'success')
     
     return redirect(url_for('view_knowledge', knowledge_id=knowledge_id))
 
-# Create templates directory and basic templates
-def create_templates():
-    """Create basic HTML templates."""
-    os.makedirs('templates', exist_ok=True)
-    
-    # Base template
-    base_template = '''<!DOCTYPE html>
-<html>
-<head>
-    <title>{% block title %}Knowledge System{% endblock %}</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-    <style>
-        .code-block { background: #f8f9fa; padding: 1rem; border-radius: 0.375rem; font-family: monospace; }
-        .tag { background: #e9ecef; padding: 0.25rem 0.5rem; border-radius: 0.25rem; margin: 0.125rem; display: inline-block; }
-    </style>
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-primary">
-        <div class="container">
-            <a class="navbar-brand" href="{{ url_for('index') }}">📚 Knowledge System</a>
-            <div class="navbar-nav">
-                <a class="nav-link" href="{{ url_for('index') }}">Dashboard</a>
-                <a class="nav-link" href="{{ url_for('add_knowledge') }}">Add Knowledge</a>
-                <a class="nav-link" href="{{ url_for('search') }}">Search</a>
-            </div>
-        </div>
-    </nav>
-    
-    <div class="container mt-4">
-        {% with messages = get_flashed_messages(with_categories=true) %}
-            {% if messages %}
-                {% for category, message in messages %}
-                    <div class="alert alert-{{ 'danger' if category == 'error' else 'success' }} alert-dismissible fade show">
-                        {{ message }}
-                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-                    </div>
-                {% endfor %}
-            {% endif %}
-        {% endwith %}
-        
-        {% block content %}{% endblock %}
-    </div>
-    
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
-</body>
-</html>'''
-    
-    # Index template
-    index_template = '''{% extends "base.html" %}
-{% block title %}Dashboard - Knowledge System{% endblock %}
-{% block content %}
-<div class="row">
-    <div class="col-md-4">
-        <div class="card">
-            <div class="card-header"><h5>📊 Statistics</h5></div>
-            <div class="card-body">
-                <p><strong>Total Knowledge:</strong> {{ stats.total_count }}</p>
-                <p><strong>Recent (7 days):</strong> {{ stats.recent_additions }}</p>
-                <h6>Categories:</h6>
-                {% for category, count in stats.categories.items() %}
-                    <span class="tag">{{ category }}: {{ count }}</span>
-                {% endfor %}
-            </div>
-        </div>
-    </div>
-    <div class="col-md-8">
-        <div class="card">
-            <div class="card-header">
-                <h5>🕒 Recent Knowledge</h5>
-                <a href="{{ url_for('add_knowledge') }}" class="btn btn-primary btn-sm float-end">Add New</a>
-            </div>
-            <div class="card-body">
-                {% for knowledge in recent_knowledge %}
-                    <div class="border-bottom pb-2 mb-2">
-                        <h6><a href="{{ url_for('view_knowledge', knowledge_id=knowledge.id) }}">{{ knowledge.title }}</a></h6>
-                        <small class="text-muted">{{ knowledge.category }} • {{ knowledge.created_at }}</small>
-                    </div>
-                {% endfor %}
-            </div>
-        </div>
-    </div>
-</div>
-{% endblock %}'''
-    
-    # Add template
-    add_template = '''{% extends "base.html" %}
-{% block title %}Add Knowledge{% endblock %}
-{% block content %}
-<div class="card">
-    <div class="card-header"><h5>📝 Add New Knowledge</h5></div>
-    <div class="card-body">
-        <form method="POST">
-            <div class="mb-3">
-                <label class="form-label">Issue Title *</label>
-                <input type="text" class="form-control" name="title" required>
-            </div>
-            
-            <div class="mb-3">
-                <label class="form-label">Problem Description *</label>
-                <textarea class="form-control" name="problem" rows="4" required></textarea>
-            </div>
-            
-            <div class="mb-3">
-                <label class="form-label">Solution Steps *</label>
-                <textarea class="form-control" name="solution" rows="6" required></textarea>
-            </div>
-            
-            <div class="row">
-                <div class="col-md-6">
-                    <div class="mb-3">
-                        <label class="form-label">Category</label>
-                        <select class="form-control" name="category">
-                            {% for category in config.categories %}
-                                <option value="{{ category }}">{{ category.replace('_', ' ').title() }}</option>
-                            {% endfor %}
-                        </select>
-                    </div>
-                </div>
-                <div class="col-md-6">
-                    <div class="mb-3">
-                        <label class="form-label">Shopify Product</label>
-                        <select class="form-control" name="shopify_product">
-                            <option value="">Select product...</option>
-                            {% for product in config.shopify_products %}
-                                <option value="{{ product }}">{{ product }}</option>
-                            {% endfor %}
-                        </select>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="mb-3">
-                <label class="form-label">Code Examples</label>
-                <textarea class="form-control font-monospace" name="code_examples" rows="4"></textarea>
-            </div>
-            
-            <div class="mb-3">
-                <label class="form-label">Tags</label>
-                <input type="text" class="form-control" name="tags" placeholder="comma, separated, tags">
-            </div>
-            
-            <div class="mb-3">
-                <label class="form-label">Notes</label>
-                <textarea class="form-control" name="notes" rows="3"></textarea>
-            </div>
-            
-            <button type="submit" class="btn btn-primary">💾 Save Knowledge</button>
-            <a href="{{ url_for('index') }}" class="btn btn-secondary">Cancel</a>
-        </form>
-    </div>
-</div>
-{% endblock %}'''
-    
-    # Search template
-    search_template = '''{% extends "base.html" %}
-{% block title %}Search Knowledge{% endblock %}
-{% block content %}
-<div class="card mb-4">
-    <div class="card-header"><h5>🔍 Search Knowledge</h5></div>
-    <div class="card-body">
-        <form method="GET">
-            <div class="row">
-                <div class="col-md-6">
-                    <input type="text" class="form-control" name="q" value="{{ query }}" placeholder="Search terms...">
-                </div>
-                <div class="col-md-3">
-                    <select class="form-control" name="category">
-                        <option value="">All categories</option>
-                        {% for category in config.categories %}
-                            <option value="{{ category }}" {{ 'selected' if category == category }}>
-                                {{ category.replace('_', ' ').title() }}
-                            </option>
-                        {% endfor %}
-                    </select>
-                </div>
-                <div class="col-md-3">
-                    <button type="submit" class="btn btn-primary">Search</button>
-                </div>
-            </div>
-        </form>
-    </div>
-</div>
-
-{% if results %}
-<div class="card">
-    <div class="card-header"><h5>Results ({{ results|length }})</h5></div>
-    <div class="card-body">
-        {% for knowledge in results %}
-            <div class="border-bottom pb-3 mb-3">
-                <h6><a href="{{ url_for('view_knowledge', knowledge_id=knowledge.id) }}">{{ knowledge.title }}</a></h6>
-                <p class="text-muted">{{ knowledge.problem[:200] }}...</p>
-                <small>
-                    <span class="tag">{{ knowledge.category }}</span>
-                    {% if knowledge.shopify_product %}
-                        <span class="tag">{{ knowledge.shopify_product }}</span>
-                    {% endif %}
-                    • Used {{ knowledge.usage_count }} times
-                </small>
-            </div>
-        {% endfor %}
-    </div>
-</div>
-{% endif %}
-{% endblock %}'''
-    
-    # View template
-    view_template = '''{% extends "base.html" %}
-{% block title %}{{ knowledge.title }}{% endblock %}
-{% block content %}
-<div class="card">
-    <div class="card-header">
-        <h5>📝 {{ knowledge.title }}</h5>
-        <small class="text-muted">
-            {{ knowledge.category }} • {{ knowledge.created_at }}
-            {% if knowledge.shopify_product %} • {{ knowledge.shopify_product }}{% endif %}
-        </small>
-    </div>
-    <div class="card-body">
-        <h6>❗ Problem:</h6>
-        <p>{{ knowledge.problem }}</p>
-        
-        <h6>✅ Solution:</h6>
-        <div>{{ knowledge.solution | replace('\n', '<br>') | safe }}</div>
-        
-        {% if knowledge.code_examples %}
-            <h6>💻 Code Examples:</h6>
-            <div class="code-block">{{ knowledge.code_examples }}</div>
-        {% endif %}
-        
-        {% if knowledge.tags %}
-            <h6>🏷️ Tags:</h6>
-            {% for tag in knowledge.tags.split(',') %}
-                <span class="tag">{{ tag.strip() }}</span>
-            {% endfor %}
-        {% endif %}
-        
-        {% if knowledge.notes %}
-            <h6>📋 Notes:</h6>
-            <p>{{ knowledge.notes }}</p>
-        {% endif %}
-        
-        <hr>
-        <p><small>📊 Used {{ knowledge.usage_count }} times • Source: {{ knowledge.source }}</small></p>
-        
-        <form method="POST" action="{{ url_for('use_knowledge', knowledge_id=knowledge.id) }}" class="d-inline">
-            <button type="submit" name="helpful" value="true" class="btn btn-success btn-sm">👍 Helpful</button>
-            <button type="submit" name="helpful" value="false" class="btn btn-outline-secondary btn-sm">👎 Not Helpful</button>
-        </form>
-    </div>
-</div>
-{% endblock %}'''
-    
-    # Write templates
-    with open('templates/base.html', 'w') as f:
-        f.write(base_template)
-    with open('templates/index.html', 'w') as f:
-        f.write(index_template)
-    with open('templates/add.html', 'w') as f:
-        f.write(add_template)
-    with open('templates/search.html', 'w') as f:
-        f.write(search_template)
-    with open('templates/view.html', 'w') as f:
-        f.write(view_template)
+def import_file(file_path):
+    """Bulk-load entries from a JSON list or a knowledge.py export file."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rows = data['knowledge'] if isinstance(data, dict) else data
+    count = db.bulk_import(rows)
+    _invalidate_caches()
+    return count
 
 if __name__ == '__main__':
-    # create_templates()  # Commented out to preserve custom template changes
-    print("🌐 Starting web interface at http://localhost:5000")
-    app.run(debug=True, host='127.0.0.1', port=5000)
+    parser = argparse.ArgumentParser(description='Knowledge System web interface')
+    parser.add_argument('--import', dest='import_file', metavar='FILE',
+                        help='Bulk-import entries from a JSON file and exit')
+    args = parser.parse_args()
+    
+    if args.import_file:
+        try:
+            count = import_file(args.import_file)
+        except sqlite3.IntegrityError as e:
+            # Imports are all-or-nothing; entries with a UUID already present abort them
+            print(f"❌ Nothing imported from {args.import_file}: {e}")
+        else:
+            print(f"✅ Imported {count} entries from {args.import_file}")
+    else:
+        print("🌐 Starting web interface at http://localhost:5000")
+        # Development server only; see wsgi.py for running under gunicorn
+        app.run(debug=False, host='127.0.0.1', port=5000)
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for the web interface.
+
+    gunicorn -w $(nproc) -k gthread --threads 4 --preload -b 127.0.0.1:5000 wsgi:app
+"""
+
+from web_interface import app